@@ -7,43 +7,66 @@ Created on Tue Dec 08 11:04:00 2020
 @author: rumm_jo
 """
 
+import array
+import csv
+import operator
 import os
-import sys
-import pathlib
+from concurrent.futures import ProcessPoolExecutor
 
 import click
 import numpy as np
-import xlwt
+from lxml import etree  # iterparse with tag filter and getprevious needed
+
+# Columns of the tables collected from the tripinfo file
+RIDE_COLUMNS = ("timeLoss", "duration", "waitingTime", "routeLength")
+WALK_COLUMNS = ("duration", "routeLength")
+TRIP_COLUMNS = ("duration", "stopTime", "routeLength")
+OCCUPANCY_COLUMNS = ("occupiedDistance", "occupiedTime")
+# Columns of the table collected from the dispatchinfo file
+LOSS_COLUMNS = ("relLoss", "relLoss2", "absLoss", "absLoss2")
+# Columns of the table collected from the direct route file
+ROUTE_COLUMNS = ("cost", "routeLength")
+
+# Vehicle id of rides which did not get a vehicle
+NULL_VEHICLE = "NULL"
+
+# Get the values of a table row from the attributes of an element at once
+get_ride_values = operator.itemgetter(*RIDE_COLUMNS)
+get_walk_values = operator.itemgetter(*WALK_COLUMNS)
+get_trip_values = operator.itemgetter(*TRIP_COLUMNS)
+get_occupancy_values = operator.itemgetter(*OCCUPANCY_COLUMNS)
+get_loss_values = operator.itemgetter(*LOSS_COLUMNS)
+get_route_values = operator.itemgetter(*ROUTE_COLUMNS)
+
+
+def iter_elements(path, tags):
+    """
+    Iterate over elements with the given tags of XML file in path.
 
-try:
-    from lxml import etree
-except ImportError:
-    try:
-        import xml.etree.cElementTree as etree
-    except ImportError:
-        try:
-            import xml.etree.ElementTree as etree
-        except ImportError:
-            print("Failed to import ElementTree from any known place")
-
-if 'SUMO_HOME' in os.environ:
-    tools = os.path.join(os.environ['SUMO_HOME'], 'tools')
-    sys.path.append(tools)
-else:
-    sys.exit("please declare environment variable 'SUMO_HOME'")
-# SUMO modules
-import traci  # noqa
-
-
-def get_root(path):
-    """Get root from XML file in path."""
-    path = pathlib.Path(path)
+    The file is parsed incrementally. Each element is cleared after it has
+    been processed and its preceding siblings are removed from the tree, so
+    the memory usage does not grow with the size of the file.
+    """
+    path = os.fspath(path)
     try:
-        tree = etree.parse(path.as_posix())
+        # huge_tree allows very large output files, ids are not needed
+        context = etree.iterparse(path, events=('end',), tag=tags,
+                                  huge_tree=True, remove_blank_text=True,
+                                  collect_ids=False)
+        for _, elem in context:
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
     except Exception as error_loading:
-        raise IOError(f"Error loading file {path.as_posix()}.") from error_loading
-    root = tree.getroot()
-    return root
+        raise IOError(f"Error loading file {path}.") from error_loading
+
+
+def count_ids(ids):
+    """Count the ids in a space separated list of ids without splitting it."""
+    if not ids:
+        return 0
+    return ids.count(" ") + 1
 
 
 def process_dispatchinfo(file):
@@ -67,26 +90,25 @@ def process_dispatchinfo(file):
 
     """
 
-    root_dispatchinfo = get_root(file)
+    n_trips = 0
     n_persons = 0
-    timeloss_rel = []
-    timeloss_abs = []
-    n_trips = len(root_dispatchinfo)
+    losses = array.array('d')  # stored row by row, see LOSS_COLUMNS
+    for dispatch_shared in iter_elements(file, 'dispatchShared'):
+        n_trips += 1
+        attrib = dispatch_shared.attrib
+        n_persons += count_ids(attrib.get("persons"))
+        n_persons += count_ids(attrib.get("sharingPersons"))
+        losses.extend(map(float, get_loss_values(attrib)))
     if n_trips == 0:
         # no dispatchinfo entries
         return None
-    for dispatch_shared in root_dispatchinfo:
-        n_persons += len(dispatch_shared.get("persons").split(" "))
-        n_persons += len(dispatch_shared.get("sharingPersons").split(" "))
-        timeloss_rel.append(dispatch_shared.get("relLoss"))
-        timeloss_rel.append(dispatch_shared.get("relLoss2"))
-        timeloss_abs.append(dispatch_shared.get("absLoss"))
-        timeloss_abs.append(dispatch_shared.get("absLoss2"))
+    losses = np.frombuffer(losses, dtype=np.float64).reshape(-1, len(LOSS_COLUMNS))
     dispatch_dict = {
         "n_trips": n_trips,
         "n_persons": n_persons,
-        "timeloss_rel": np.array(timeloss_rel, dtype=float),
-        "timeloss_abs": np.array(timeloss_abs, dtype=float)}
+        # views (one row per dispatch) without copying the columns
+        "timeloss_rel": losses[:, :2],
+        "timeloss_abs": losses[:, 2:]}
     return dispatch_dict
 
 
@@ -111,26 +133,48 @@ def process_direct_routes(file):
 
     """
 
-    root_direct_route = get_root(file)
-    n_persons = 0
-    travel_time = []
-    route_length = []
-    list_vehicles = root_direct_route.findall("vehicle")  # skip vehicle info (is not needed)
-    list_routes = [veh.find("route") for veh in list_vehicles]
-    n_routes = len(list_routes)
-    if n_routes == 0:
+    routes = array.array('d')  # stored row by row, see ROUTE_COLUMNS
+    for vehicle in iter_elements(file, 'vehicle'):
+        route = vehicle.find("route")  # skip vehicle info (is not needed)
+        routes.extend(map(float, get_route_values(route.attrib)))
+    if len(routes) == 0:
         # no direct route entries
         return None
-    for route in list_routes:
-        travel_time.append(route.get("cost"))
-        route_length.append(route.get("routeLength"))
+    routes = np.frombuffer(routes, dtype=np.float64).reshape(-1, len(ROUTE_COLUMNS))
     direct_route_dict = {
-        "n_routes": n_routes,
-        "travel_time": np.array(travel_time, dtype=float),
-        "route_length": np.array(route_length, dtype=float)}
+        "n_routes": len(routes),
+        "travel_time": routes[:, 0],
+        "route_length": routes[:, 1]}
     return direct_route_dict
 
 
+def valid_rides(depart, arrival, route_length, vehicle):
+    """
+    Check rides for validity.
+
+    A ride is invalid, if it has a negative depart, arrival or route length
+    or if it has no vehicle ("NULL"). The check is done for all rides at once.
+
+    Parameters
+    ----------
+    depart : numpy.ndarray
+        Depart of the rides.
+    arrival : numpy.ndarray
+        Arrival of the rides.
+    route_length : numpy.ndarray
+        Route length of the rides.
+    vehicle : numpy.ndarray
+        Vehicle code of the rides, -1 for vehicle "NULL".
+
+    Returns
+    -------
+    valid : numpy.ndarray
+        True for valid rides.
+
+    """
+    return (depart >= 0) & (arrival >= 0) & (route_length >= 0) & (vehicle != -1)
+
+
 def process_tripinfo(tripinfo_path, vtype='drt',
                      depart_earliest=-1, arrival_latest=-1):
     """
@@ -162,96 +206,124 @@ def process_tripinfo(tripinfo_path, vtype='drt',
 
     """
 
-    root_tripinfo = get_root(tripinfo_path)
-    list_personinfo = root_tripinfo.findall("personinfo")
-    list_tripinfo = root_tripinfo.findall(f"tripinfo[@vType='{vtype}']")
-
-    if len(list_tripinfo) == 0:
-        raise Exception(f"There is no tripinfo entry with vType='{vtype}'.")
-
-    if len(list_personinfo) == 0:
-        raise Exception("There is no personinfo entry.")
-
-    timeloss_ride = []
-    duration_ride = []
-    waiting_ride = []
-    length_ride = []
-    duration_walk = []
-    length_walk = []
-    duration_trip = []
-    stoptime_trip = []
-    length_trip = []
-    occupied_distance_trip = []
-    occupied_time_trip = []
-
-    n_personinfo_raw = len(list_personinfo)
+    # Values are stored row by row, see RIDE_COLUMNS etc. for the columns
+    rides = array.array('d')
+    walks = array.array('d')
+    trips = array.array('d')
+    occupancy = array.array('d')
+    # Values to check the rides and the number of rides and walks per person
+    ride_depart = array.array('d')
+    ride_arrival = array.array('d')
+    ride_vehicle = array.array('b')
+    person_rides = array.array('q')
+    person_walks = array.array('q')
+
+    n_personinfo_raw = 0
+    n_persons = 0  # personinfo which pass the time window filter
     n_filtered = 0  # filtered personinfo
     n_walking_only = 0  # personinfo without ride
 
-    for personinfo in list_personinfo:
+    for elem in iter_elements(tripinfo_path, ('personinfo', 'tripinfo')):
+
+        if elem.tag == 'tripinfo':
+            # Only tripinfos with the given vehicle type
+            if elem.get('vType') != vtype:
+                continue
+            trips.extend(map(float, get_trip_values(elem.attrib)))
+            for trip in elem:
+                occupancy.extend(map(float, get_occupancy_values(trip.attrib)))
+            continue
+
+        personinfo = elem
+        n_personinfo_raw += 1
 
         # Filter for time window
         if depart_earliest > 0:
             if float(personinfo.get('depart')) < depart_earliest:
                 n_filtered += 1
                 continue
-        if arrival_latest > 0:
-            arrivals = [float(entry.get('arrival')) for entry in personinfo]
-            if max(arrivals) > arrival_latest:
-                n_filtered += 1
-                continue
 
-        list_ride = personinfo.findall("ride")
-        list_walk = personinfo.findall("walk")
+        # Sort the stages of the person in a single pass over the children,
+        # which also gives the latest arrival for the time window
+        list_ride = []
+        list_walk = []
+        arrival_max = float('-inf')
+        for stage in personinfo:
+            if arrival_latest > 0:
+                arrival_max = max(arrival_max, float(stage.get('arrival')))
+            if stage.tag == 'ride':
+                list_ride.append(stage)
+            elif stage.tag == 'walk':
+                list_walk.append(stage)
+
+        if arrival_latest > 0 and arrival_max > arrival_latest:
+            n_filtered += 1
+            continue
 
         if list_walk and not list_ride:
             n_walking_only += 1
 
-        skip = False
+        # Invalid rides are filtered after parsing, see valid_rides
         for ride in list_ride:
-            # skip personinfo with depart < 0
-            if float(ride.get("depart")) < 0:
-                skip = True
-                break
-            # skip personinfo with arrival < 0
-            if float(ride.get("arrival")) < 0:
-                skip = True
-                break
-            # skip personinfo with routeLength < 0
-            if float(ride.get("routeLength")) < 0:
-                skip = True
-                break
-            # skip personinfo with vehicle "NULL"
-            if ride.get("vehicle") == "NULL":
-                skip = True
-                break
-            timeloss_ride.append(ride.get("timeLoss"))
-            duration_ride.append(ride.get("duration"))
-            waiting_ride.append(ride.get("waitingTime"))
-            length_ride.append(ride.get("routeLength"))
-
-        if skip:
-            n_filtered += 1
-            continue
+            attrib = ride.attrib
+            rides.extend(map(float, get_ride_values(attrib)))
+            ride_depart.append(float(attrib["depart"]))
+            ride_arrival.append(float(attrib["arrival"]))
+            ride_vehicle.append(-1 if attrib.get("vehicle") == NULL_VEHICLE else 0)
 
         for walk in list_walk:
-            duration_walk.append(walk.get("duration"))
-            length_walk.append(walk.get("routeLength"))
+            walks.extend(map(float, get_walk_values(walk.attrib)))
+
+        person_rides.append(len(list_ride))
+        person_walks.append(len(list_walk))
+        n_persons += 1
+
+    if len(trips) == 0:
+        raise Exception(f"There is no tripinfo entry with vType='{vtype}'.")
+
+    if n_personinfo_raw == 0:
+        raise Exception("There is no personinfo entry.")
 
-    for tripinfo in list_tripinfo:
-        duration_trip.append(tripinfo.get("duration"))
-        stoptime_trip.append(tripinfo.get("stopTime"))
-        length_trip.append(tripinfo.get("routeLength"))
-        for trip in tripinfo:
-            occupied_distance_trip.append(trip.get("occupiedDistance"))
-            occupied_time_trip.append(trip.get("occupiedTime"))
+    # Share the buffers of the arrays with numpy (no copy)
+    rides = np.frombuffer(rides, dtype=np.float64).reshape(-1, len(RIDE_COLUMNS))
+    walks = np.frombuffer(walks, dtype=np.float64).reshape(-1, len(WALK_COLUMNS))
+    person_rides = np.frombuffer(person_rides, dtype=np.int64)
+    person_walks = np.frombuffer(person_walks, dtype=np.int64)
+
+    # Skip personinfo with any invalid ride (including its walks).
+    # The rides of a person are a contiguous segment, so the persons are
+    # classified by a segment reduction over the persons with rides.
+    valid = valid_rides(np.frombuffer(ride_depart, dtype=np.float64),
+                        np.frombuffer(ride_arrival, dtype=np.float64),
+                        rides[:, 3],
+                        np.frombuffer(ride_vehicle, dtype=np.int8))
+    keep_person = np.ones(n_persons, dtype=np.bool_)
+    with_rides = person_rides > 0
+    ride_offsets = np.cumsum(person_rides) - person_rides
+    keep_person[with_rides] = np.logical_and.reduceat(
+        valid, ride_offsets[with_rides])
+    n_skipped = n_persons - int(keep_person.sum())
+    if n_skipped > 0:
+        # copy only if needed, the buffers have their final size otherwise
+        n_filtered += n_skipped
+        rides = rides[np.repeat(keep_person, person_rides)]
+        walks = walks[np.repeat(keep_person, person_walks)]
 
     rate_filtered = n_filtered/n_personinfo_raw
 
-    duration_ride_sum = np.array(duration_ride, dtype=float).sum()
-    time_occupied_sum = np.array(occupied_time_trip, dtype=float).sum()
-    duration_trip_sum = np.array(duration_trip, dtype=float).sum()
-    time_stop_sum = np.array(stoptime_trip, dtype=float).sum()
+    trips = np.frombuffer(trips, dtype=np.float64).reshape(-1, len(TRIP_COLUMNS))
+    occupancy = np.frombuffer(occupancy, dtype=np.float64).reshape(
+        -1, len(OCCUPANCY_COLUMNS))
+
+    # Column sums are computed once and reused in calculate_stats
+    ride_sum = rides.sum(axis=0)
+    walk_sum = walks.sum(axis=0)
+    trip_sum = trips.sum(axis=0)
+    occupancy_sum = occupancy.sum(axis=0)
+
+    duration_ride_sum = ride_sum[1]
+    time_occupied_sum = occupancy_sum[1]
+    duration_trip_sum, time_stop_sum, _ = trip_sum
     time_driving_sum = duration_trip_sum - time_stop_sum
 
     passengers_per_time_occupied = duration_ride_sum / time_occupied_sum
@@ -262,21 +334,17 @@ def process_tripinfo(tripinfo_path, vtype='drt',
         "n_filtered": n_filtered,
         "rate_filtered": rate_filtered,
         "n_walking_only": n_walking_only,
-        "n_rides": len(duration_ride),
-        "n_vehicles":  len(duration_trip),
-        "n_walks": len(duration_walk),
-        "timeloss_ride":  np.array(timeloss_ride, dtype=float),
-        "duration_ride":  np.array(duration_ride, dtype=float),
-        "waiting_ride":  np.array(waiting_ride, dtype=float),
-        "length_ride":  np.array(length_ride, dtype=float),
-        "duration_walk":  np.array(duration_walk, dtype=float),
-        "length_walk": np.array(length_walk, dtype=float),
-        "duration_trip": np.array(duration_trip, dtype=float),
-        "stoptime_trip": np.array(stoptime_trip, dtype=float),
-        "length_trip": np.array(length_trip, dtype=float),
-        "occupied_distance_trip": np.array(
-            occupied_distance_trip, dtype=float),
-        "occupied_time_trip": np.array(occupied_time_trip, dtype=float),
+        "n_rides": len(rides),
+        "n_vehicles":  len(trips),
+        "n_walks": len(walks),
+        "rides": rides,
+        "walks": walks,
+        "trips": trips,
+        "occupancy": occupancy,
+        "ride_sum": ride_sum,
+        "walk_sum": walk_sum,
+        "trip_sum": trip_sum,
+        "occupancy_sum": occupancy_sum,
         "passengers_per_time_occupied": passengers_per_time_occupied,
         "passengers_per_time_driving": passengers_per_time_driving
     }
@@ -306,18 +374,24 @@ def calculate_stats(tripinfo_dict, dispatch_dict, direct_routes_dict):
         n_direct_routes = direct_routes_dict["n_routes"]
         direct_travel_time_mean = direct_routes_dict["travel_time"].mean()/60  # in minutes
         direct_route_length_sum = direct_routes_dict["route_length"].sum()/1000  # in km
-        direct_route_length_mean = direct_routes_dict["route_length"].mean()/1000  # in km
+        direct_route_length_mean = direct_route_length_sum/n_direct_routes  # in km
     else:
         n_direct_routes = -1
         direct_travel_time_mean = -1
         direct_route_length_sum = -1
         direct_route_length_mean = -1
 
-    waiting_ride_mean = tripinfo_dict["waiting_ride"].mean()/60
-    waiting_ride_std = tripinfo_dict["waiting_ride"].std()/60
-    distance_ride = tripinfo_dict["length_ride"].sum()/1000
-    distance_ride_mean = tripinfo_dict["length_ride"].mean()/1000
-    duration_ride_mean = tripinfo_dict["duration_ride"].mean()/60
+    # Column sums come from process_tripinfo, only the deviation needs a pass
+    rides = tripinfo_dict["rides"]
+    ride_sum = tripinfo_dict["ride_sum"]
+    ride_mean = ride_sum / n_rides
+    ride_std = np.sqrt(((rides - ride_mean)**2).sum(axis=0) / n_rides)
+
+    waiting_ride_mean = ride_mean[2]/60
+    waiting_ride_std = ride_std[2]/60
+    distance_ride = ride_sum[3]/1000
+    distance_ride_mean = ride_mean[3]/1000
+    duration_ride_mean = ride_mean[1]/60
 
     if dispatch_dict:
         timeloss_rel_mean = dispatch_dict["timeloss_rel"].mean()
@@ -328,27 +402,30 @@ def calculate_stats(tripinfo_dict, dispatch_dict, direct_routes_dict):
 
     # Walks
     n_walks = tripinfo_dict["n_walks"]
-    distance_walk_mean = tripinfo_dict["length_walk"].mean()/1000
-    duration_walk_mean = tripinfo_dict["duration_walk"].mean()/60
+    walk_mean = tripinfo_dict["walk_sum"] / n_walks
+    distance_walk_mean = walk_mean[1]/1000
+    duration_walk_mean = walk_mean[0]/60
     duration_trip_mean = duration_ride_mean + 2 * duration_walk_mean
 
     # Vehicle trips
     n_vehicles = tripinfo_dict["n_vehicles"]
-
-    distance_vehicle = tripinfo_dict["length_trip"].sum()/1000
-    distance_vehicle_mean = tripinfo_dict["length_trip"].mean()/1000
-    distance_vehicle_occupied = tripinfo_dict[
-        "occupied_distance_trip"].sum()/1000
-    distance_vehicle_occupied_mean = tripinfo_dict[
-        "occupied_distance_trip"].mean()/1000
+    trip_sum = tripinfo_dict["trip_sum"]
+    trip_mean = trip_sum / n_vehicles
+    n_occupancy = len(tripinfo_dict["occupancy"])
+    occupancy_sum = tripinfo_dict["occupancy_sum"]
+    occupancy_mean = occupancy_sum / n_occupancy
+
+    distance_vehicle = trip_sum[2]/1000
+    distance_vehicle_mean = trip_mean[2]/1000
+    distance_vehicle_occupied = occupancy_sum[0]/1000
+    distance_vehicle_occupied_mean = occupancy_mean[0]/1000
     distance_vehicle_empty = distance_vehicle - distance_vehicle_occupied
 
-    duration_vehicle = tripinfo_dict["duration_trip"].sum()/60
-    duration_vehicle_occupied = tripinfo_dict["occupied_time_trip"].sum()/60
-    duration_vehicle_occupied_mean = tripinfo_dict[
-        "occupied_time_trip"].mean()/60
-    duration_vehicle_stop = tripinfo_dict["stoptime_trip"].sum()/60
-    duration_vehicle_stop_mean = tripinfo_dict["stoptime_trip"].mean()/60
+    duration_vehicle = trip_sum[0]/60
+    duration_vehicle_occupied = occupancy_sum[1]/60
+    duration_vehicle_occupied_mean = occupancy_mean[1]/60
+    duration_vehicle_stop = trip_sum[1]/60
+    duration_vehicle_stop_mean = trip_mean[1]/60
     duration_vehicle_driving = duration_vehicle - duration_vehicle_stop
 
     output_dict = {
@@ -397,6 +474,27 @@ def calculate_stats(tripinfo_dict, dispatch_dict, direct_routes_dict):
     return output_dict
 
 
+def dict2csv(output_file, output_dict):
+    """
+    Write output_dict to CSV file (one key and value per row).
+
+    Parameters
+    ----------
+    output_file : str
+        Name of CSV file.
+    output_dict : dict
+        Output dictionary.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    with open(output_file, 'w', newline='') as csv_file:
+        csv.writer(csv_file).writerows(output_dict.items())
+
+
 def dict2xls(output_file, output_dict):
     """
     Write output_dict to Excel 97 file.
@@ -414,6 +512,9 @@ def dict2xls(output_file, output_dict):
 
     """
 
+    # optional dependency, only needed for Excel output
+    import xlwt
+
     workbook = xlwt.Workbook()
     worksheet = workbook.add_sheet("output")
 
@@ -430,7 +531,8 @@ def dict2xls(output_file, output_dict):
 @click.option('-t', '--tripinfo', default="tripinfo.output.xml", help='Tripinfo xml file.')
 @click.option('-d', '--dispatchinfo', help='Dispatchinfo xml file.')
 @click.option('-r', '--direct-routes', help='Route file with direct routes of the booked requests.')
-@click.option('-o', '--output', default="output.xls", help='Output Excel file.')
+@click.option('-o', '--output', default="output.csv",
+              help='Output CSV file (or Excel file, if it ends with .xls).')
 @click.option('-v', '--vtype', default="drt", help='Vehicle type to consider.')
 @click.option('--depart-earliest', default=-1, type=float,
               help='Earliest departure to consider.')
@@ -449,7 +551,7 @@ def main(tripinfo, dispatchinfo, direct_routes, output, vtype, depart_earliest,
     direct_routes : str or path-like, optional
         Route file with direct routes of the booked requests.
     output : str
-        Output xls file.
+        Output csv file. An Excel file is written, if it ends with .xls.
     vtype: str, optional
         Only tripinfos with this vehicle type are considered.
         The default is 'drt'.
@@ -466,18 +568,28 @@ def main(tripinfo, dispatchinfo, direct_routes, output, vtype, depart_earliest,
 
     """
     # Process output files and write stats to csv file.
-    tripinfo_dict = process_tripinfo(
-        tripinfo, vtype, depart_earliest, arrival_latest)
-    if dispatchinfo:
-        dispatch_dict = process_dispatchinfo(dispatchinfo)
-    else:
-        dispatch_dict = None
-    if direct_routes:
-        direct_routes_dict = process_direct_routes(direct_routes)
-    else:
-        direct_routes_dict = None
+    # The files are independent: the optional files are processed in worker
+    # processes while the (largest) tripinfo file is processed here.
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        if dispatchinfo:
+            future_dispatch = executor.submit(process_dispatchinfo, dispatchinfo)
+        else:
+            future_dispatch = None
+        if direct_routes:
+            future_direct_routes = executor.submit(
+                process_direct_routes, direct_routes)
+        else:
+            future_direct_routes = None
+        tripinfo_dict = process_tripinfo(
+            tripinfo, vtype, depart_earliest, arrival_latest)
+        dispatch_dict = future_dispatch.result() if future_dispatch else None
+        direct_routes_dict = (
+            future_direct_routes.result() if future_direct_routes else None)
     output_dict = calculate_stats(tripinfo_dict, dispatch_dict, direct_routes_dict)
-    dict2xls(output, output_dict)
+    if os.path.splitext(output)[1].lower() == '.xls':
+        dict2xls(output, output_dict)
+    else:
+        dict2csv(output, output_dict)
 
 
 if __name__ == '__main__':